@@ -65,26 +65,17 @@ def main():
     # 2. Instanciar el parser
     pdf_parser = PdfParser()
     
-    # 3. Extraer todos los chunks (texto, tablas, imágenes)
-    pdf_parser.parse(input_pdf_path)
-
-    # 4. Guardar imágenes de las tablas
-    logger.info("Guardando tablas como imágenes...")
-    pdf_parser.save_tables_as_images(input_pdf_path, OUTPUT_DIR)
-    
-    # 5. Guardar imágenes de las figuras
-    logger.info("Guardando figuras como imágenes...")
-    pdf_parser.save_pictures_as_images(input_pdf_path, OUTPUT_DIR)
+    # 3. Extraer todos los chunks (texto, tablas, imágenes) y guardar
+    #    las tablas y figuras como imágenes en una sola pasada
+    logger.info("Extrayendo chunks y guardando tablas y figuras como imágenes...")
+    pdf_parser.parse_and_export(input_pdf_path, OUTPUT_DIR)
     
-    # 6. Reconstruir y guardar el PDF como Markdown
+    # 4. Reconstruir y guardar el PDF como Markdown
     logger.info("Reconstruyendo el documento a formato Markdown...")
-    markdown_content = pdf_parser.reconstruct_to_markdown(input_pdf_path)
-    
     markdown_filename = f"{input_pdf_path.stem}.md"
     markdown_output_path = OUTPUT_DIR / markdown_filename
     
-    with open(markdown_output_path, "w", encoding="utf-8") as f:
-        f.write(markdown_content)
+    pdf_parser.reconstruct_to_markdown_file(input_pdf_path, markdown_output_path)
     logger.info(f"Documento Markdown guardado en: {markdown_output_path}")
     
     logger.info("-" * 50)
@@ -1 +1 @@
-from ollama_client import OllamaClient
\ No newline at end of file
+from .ollama_client import OllamaClient
@@ -1,3 +1,4 @@
+import asyncio
 import ollama
 import logging
 from typing import Optional, List
@@ -65,3 +66,16 @@ class OllamaClient:
             logger.error(f"Error during response generation with Ollama: {e}")
             return "Sorry, an error occurred while communicating with the language model."
 
+    async def agenerate_response(self, prompt: str, images_base64: Optional[List[str]] = None) -> str:
+        """
+        Asynchronous version of generate_response. The blocking call runs in a worker
+        thread so several requests to Ollama can be in flight at the same time.
+
+        Args:
+            prompt (str): The text prompt for the LLM.
+            images_base64 (Optional[List[str]]): A list of images encoded in base64.
+
+        Returns:
+            str: The response generated by the model.
+        """
+        return await asyncio.to_thread(self.generate_response, prompt, images_base64)
@@ -1,21 +1,68 @@
+import binascii
+import io
+import threading
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Literal, Any, Dict, Optional
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, List, Literal, Any, Dict, Optional, Union
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from PIL.Image import Image
+
 # We define the chunk type to have strict control over the possible values.
 ChunkType = Literal["text", "table", "image"]
 
-@dataclass
+# Per-thread scratch buffer reused by every image encoding, instead of allocating one per image
+_encode_buffers = threading.local()
+
+def _image_to_base64(image: "Image", format: str = "PNG") -> str:
+    """
+    Converts a PIL image object to a base64 string, encoded as PNG or JPEG.
+    JPEG is much smaller for photographic content but lossy, so PNG should be
+    kept where text fidelity matters (e.g. tables).
+    """
+    buffered = getattr(_encode_buffers, "buffer", None)
+    if buffered is None:
+        buffered = _encode_buffers.buffer = io.BytesIO()
+    # Only rewind: truncate() would shrink the allocation, so bytes past tell() are stale leftovers
+    buffered.seek(0)
+    if format == "JPEG":
+        image.convert("RGB").save(buffered, "JPEG", quality=85, optimize=False)
+    else:
+        image.save(buffered, format="PNG", compress_level=1)
+    # getbuffer() avoids copying the encoded bytes; the views must be released before the buffer can grow
+    with buffered.getbuffer() as view, view[:buffered.tell()] as encoded:
+        return binascii.b2a_base64(encoded, newline=False).decode('ascii')
+
+@dataclass(slots=True, frozen=True)
 class DocumentChunk:
     """
     Represents a unit of information extracted from a document.
     This is the standard format that all parsers must return.
+    Chunks are immutable and use __slots__ to keep large documents light in memory.
     """
-    content: str  # Main content: text, table as markdown, or image as base64.
+    content: Union[str, "Image"]  # Main content: text, table as markdown, or the PIL image of a table/picture.
     type: ChunkType # texts, tables, images
     source_page: int
     metadata: Dict[str, Any]  # Additional metadata (e.g., image caption).
+    _base64: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def as_base64(self) -> str:
+        """
+        Returns the image content as a base64 string. Images are only encoded
+        the first time this is called, so chunks that are never sent to a
+        vision model skip the encoding entirely. Pictures are encoded as JPEG
+        and tables as PNG, to keep their text sharp.
+        """
+        if self._base64 is None:
+            if isinstance(self.content, str):
+                # Already encoded by the parser that produced the chunk.
+                encoded = self.content
+            else:
+                encoded = _image_to_base64(self.content, "JPEG" if self.type == "image" else "PNG")
+            # The chunk is frozen; the memoized encoding is the only field set after construction.
+            object.__setattr__(self, "_base64", encoded)
+        return self._base64
 
 class BaseParser(ABC):
     """
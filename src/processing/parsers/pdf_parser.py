@@ -1,62 +1,248 @@
 
-import base64
-import io
+import hashlib
+import itertools
+import importlib.metadata
 import logging
+import os
+import pickle
+import shutil
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 import tempfile 
+import warnings
 
-from PIL.Image import Image
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
 from docling_core.types.doc import DocItem, PictureItem, TableItem, TextItem, TitleItem
 
 from .base_parser import BaseParser, DocumentChunk
 
+if TYPE_CHECKING:
+    from PIL.Image import Image
+
 # Configure a logger for this module
 logger = logging.getLogger(__name__)
 
+# On-disk cache of converted documents, keyed by a hash of the PDF bytes
+DOC_CACHE_DIR = Path.home() / ".cache" / "rag-in-a-box" / "docling"
+
+# Worker processes used for PNG encoding, and how many encodes may be queued per worker
+_ENCODE_WORKERS = os.cpu_count() or 1
+_ENCODE_JOBS_PER_WORKER = 2
+
+def _encode_png(image: "Image", path: Path) -> None:
+    """
+    Saves an image as a PNG file. Runs in a worker process: PIL images pickle with
+    their mode and palette, so the file matches what the parent would have written.
+    """
+    # These PNGs are transient RAG inputs, so favour speed over compression ratio.
+    image.save(path, "PNG", compress_level=1)
+
+@lru_cache(maxsize=1)
+def _encode_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every encode, created on first use and kept for the process lifetime."""
+    return ProcessPoolExecutor(max_workers=_ENCODE_WORKERS)
+
+def _run_encode_jobs(func: Callable[..., Any], jobs: Iterable[tuple]) -> List[Any]:
+    """
+    Runs PNG encoding jobs in a process pool, since zlib compression is CPU-bound
+    and would otherwise run serially under the GIL. A single job is run inline.
+    Jobs are consumed lazily and only a bounded number are in flight at once, so
+    the pickled images waiting in the call queue never add up to the whole document.
+
+    Returns:
+        List[Any]: The results of `func`, in the same order as `jobs`.
+    """
+    jobs = iter(jobs)
+    first = next(jobs, None)
+    if first is None:
+        return []
+    second = next(jobs, None)
+    if second is None:
+        return [func(*first)]
+
+    executor = _encode_pool()
+    in_flight: Deque[Future] = deque()
+    results = []
+    try:
+        for job in itertools.chain((first, second), jobs):
+            if len(in_flight) >= _ENCODE_WORKERS * _ENCODE_JOBS_PER_WORKER:
+                results.append(in_flight.popleft().result())
+            in_flight.append(executor.submit(func, *job))
+        results.extend(future.result() for future in in_flight)
+    except BrokenProcessPool:
+        # A dead worker breaks the pool for good; build a fresh one on the next call
+        _encode_pool.cache_clear()
+        raise
+    return results
+
+@lru_cache(maxsize=1)
+def _docling_version() -> str:
+    """Installed Docling version, part of the cache key so an upgrade never serves stale conversions."""
+    try:
+        return importlib.metadata.version("docling")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+@lru_cache(maxsize=8)
+def _load_cached_doc(cache_path: Path) -> DocItem:
+    """Unpickles a converted document from the disk cache, memoized for in-process re-entry."""
+    with open(cache_path, "rb") as f:
+        return pickle.load(f)
+
 class PdfParser(BaseParser):
     """
     A specific parser for PDF documents that uses the Docling library.
     Extracts text, tables, and images in an order organized by page.
     """
 
-    def __init__(self, image_resolution_scale: float = 2.0):
+    def __init__(self, image_resolution_scale: float = 2.0, enable_cache: bool = True):
         """
-        Initializes the Docling converter and the parser's state.
+        Initializes the parser's state. The Docling converter is only built when
+        a document actually needs converting (see `converter`).
+
+        Args:
+            image_resolution_scale (float): Scale used by Docling when rendering page and picture images.
+            enable_cache (bool): Whether to reuse converted documents from the on-disk cache
+                in DOC_CACHE_DIR (~/.cache/rag-in-a-box/docling). Entries include the rendered
+                page images, so they can be large, and the cache is not size-bounded: delete
+                the directory to reclaim space.
         """
         logger.info(f"Initializing PdfParser with image scale: {image_resolution_scale}")
+        self.image_resolution_scale = image_resolution_scale
+        self.enable_cache = enable_cache
+        
+        # State variables for the last parsed document
+        self.chunks: List[DocumentChunk] = []
+        # The same chunks bucketed by type at insertion time, backing the getter methods
+        self._by_type: Dict[str, List[DocumentChunk]] = {"text": [], "table": [], "image": []}
+        self._doc: Optional[DocItem] = None
+        self._doc_path: Optional[Path] = None
+        # Path of the document whose chunks and images are held below (set once parse() completes)
+        self._parsed_path: Optional[Path] = None
+        # Rendered images of the last parsed document, reused by the saver methods
+        self._tables: List[Tuple[TableItem, "Image"]] = []
+        self._pictures: List[Tuple[PictureItem, "Image"]] = []
+
+    @cached_property
+    def converter(self):
+        """
+        The Docling converter, built on first use. Importing it pulls in Docling's
+        whole ML pipeline, which cached documents and Markdown reconstruction of an
+        already loaded document do not need.
+        """
+        from docling.document_converter import DocumentConverter, PdfFormatOption
+        from docling.datamodel.base_models import InputFormat
+        from docling.datamodel.pipeline_options import PdfPipelineOptions
+
         pipeline_options = PdfPipelineOptions(
-            images_scale=image_resolution_scale,
+            images_scale=self.image_resolution_scale,
             generate_page_images=True,
             generate_picture_images=True
         )
-        self.converter = DocumentConverter(
+        return DocumentConverter(
             format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)}
         )
-        
-        # State variables for the last parsed document
-        self.chunks: List[DocumentChunk] = []
-        self._doc: Optional[DocItem] = None
-        self._doc_path: Optional[Path] = None
 
-    def _image_to_base64(self, image: Image) -> str:
-        """Converts a PIL image object to a base64 string."""
-        buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
-    
     def _load_and_get_doc(self, file_path: Path) -> DocItem:
         """Helper to load document with Docling if not already loaded."""
         if self._doc is None or self._doc_path != file_path:
             logger.info(f"Loading document from: {file_path.name}")
-            conv_res = self.converter.convert(str(file_path))
-            self._doc = conv_res.document
+            if self.enable_cache:
+                self._doc = self._convert_with_cache(file_path)
+            else:
+                self._doc = self.converter.convert(str(file_path)).document
             self._doc_path = file_path
         return self._doc
 
+    def _convert_with_cache(self, file_path: Path) -> DocItem:
+        """
+        Converts the document with Docling, reusing a previous conversion of the same
+        file contents (with the same image scale and Docling version) from the on-disk
+        cache when available.
+        """
+        digest = hashlib.blake2b(file_path.read_bytes(), digest_size=16).hexdigest()
+        cache_path = DOC_CACHE_DIR / f"{digest}-{self.image_resolution_scale}-docling{_docling_version()}.pickle"
+        if cache_path.exists():
+            try:
+                doc = _load_cached_doc(cache_path)
+                logger.info(f"Loaded converted document from cache: {cache_path}")
+                return doc
+            except Exception as e:
+                logger.warning(f"Could not read cached document {cache_path}, converting again: {e}")
+
+        doc = self.converter.convert(str(file_path)).document
+        # Write to a temporary file first so an interrupted run never leaves a truncated cache entry
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            DOC_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(doc, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+            logger.debug(f"Cached converted document to {cache_path}")
+        except Exception as e:
+            logger.warning(f"Could not write document cache {cache_path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+        return doc
+
+    # --- ELEMENT HANDLERS ---
+    # Each handler turns one Docling element into a chunk, or returns None to skip it.
+    def _handle_text(self, element: TextItem, doc: DocItem, page_num: int) -> Optional[DocumentChunk]:
+        if not element.text.strip():  # Only add if not empty
+            return None
+        return DocumentChunk(
+            content=element.text, type="text", source_page=page_num,
+            metadata={"type": type(element).__name__}
+        )
+
+    def _handle_table(self, element: TableItem, doc: DocItem, page_num: int) -> DocumentChunk:
+        # Keep the table as an image
+        image = element.get_image(doc=doc)
+        caption = element.caption_text(doc=doc)
+        self._tables.append((element, image))
+        return DocumentChunk(
+            content=image, type="table", source_page=page_num,
+            metadata={"caption": caption if caption else ""}
+        )
+
+    def _handle_picture(self, element: PictureItem, doc: DocItem, page_num: int) -> DocumentChunk:
+        image = element.get_image(doc=doc)
+        caption = element.caption_text(doc=doc)
+        self._pictures.append((element, image))
+        return DocumentChunk(
+            content=image, type="image", source_page=page_num,
+            metadata={"caption": caption if caption else ""}
+        )
+
+    _DISPATCH: Dict[type, Callable[..., Optional[DocumentChunk]]] = {
+        TextItem: _handle_text,
+        TitleItem: _handle_text,
+        TableItem: _handle_table,
+        PictureItem: _handle_picture,
+    }
+    # Handlers resolved per concrete element type (None when unhandled), filled on first sight
+    _resolved_handlers: Dict[type, Optional[Callable[..., Optional[DocumentChunk]]]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # A subclass may override _DISPATCH, so it must not share its parent's memo
+        cls._resolved_handlers = {}
+
+    @classmethod
+    def _handler_for(cls, element_type: type) -> Optional[Callable[..., Optional[DocumentChunk]]]:
+        """
+        Returns the handler for an element type. Subclasses (e.g. section headers
+        and list items, which are TextItems) resolve to their closest registered base.
+        """
+        try:
+            return cls._resolved_handlers[element_type]
+        except KeyError:
+            handler = next((cls._DISPATCH[base] for base in element_type.__mro__ if base in cls._DISPATCH), None)
+            cls._resolved_handlers[element_type] = handler
+            return handler
+
     def parse(self, file_path: str | Path) -> List[DocumentChunk]:
         """
         Processes a PDF file and extracts its content into a structured list of chunks.
@@ -71,128 +257,235 @@ class PdfParser(BaseParser):
         
         # Reset state for the new document
         self.chunks = []
-        text_count, table_count, image_count = 0, 0, 0
+        self._by_type = {"text": [], "table": [], "image": []}
+        self._tables = []
+        self._pictures = []
+        self._parsed_path = None
+        debug = logger.isEnabledFor(logging.DEBUG)
 
         # Iterate through each page to get the content in order and the page number.
         for element, _level in doc.iterate_items():
-            prov_list = getattr(element, "prov", [])            
-            page_num = prov_list[0].page_no if prov_list and hasattr(prov_list[0], "page_no") else 0
-            chunk = None
-            if isinstance(element, (TextItem, TitleItem)):
-                if element.text.strip():  # Only add if not empty
-                    chunk = DocumentChunk(
-                        content=element.text, type="text", source_page=page_num,
-                        metadata={"type": type(element).__name__}
-                    )
-                    text_count += 1
-            elif isinstance(element, TableItem):
-                # Save table as image
-                image = element.get_image(doc=doc)
-                image_b64 = self._image_to_base64(image)
-                caption = element.caption_text(doc=doc)
-                chunk = DocumentChunk(
-                    content=image_b64, type="table", source_page=page_num,
-                    metadata={"caption": caption if caption else ""}
-                )
-                table_count += 1
-            elif isinstance(element, PictureItem):
-                image = element.get_image(doc=doc)
-                image_b64 = self._image_to_base64(image)
-                caption = element.caption_text(doc=doc)
-                chunk = DocumentChunk(
-                    content=image_b64, type="image", source_page=page_num,
-                    metadata={"caption": caption if caption else ""}
-                )
-                image_count += 1  
-            # Add chunk to list              
+            handler = self._handler_for(type(element))
+            if handler is None:
+                continue
+            if debug:
+                logger.debug("element=%s level=%s", element.self_ref, _level)
+            # Provenance is almost always present, so EAFP is cheaper than checking first
+            try:
+                page_num = element.prov[0].page_no
+            except (AttributeError, IndexError):
+                page_num = 0
+            chunk = handler(self, element, doc, page_num)
+            # Add chunk to list
             if chunk:
                 self.chunks.append(chunk)
+                self._by_type[chunk.type].append(chunk)
 
+        self._parsed_path = file_path
         logger.info(f"Parsing complete. Extracted {len(self.chunks)} total chunks.")
-        logger.info(f"Summary: {text_count} text chunks, {table_count} table chunks, {image_count} image chunks.")
+        logger.info(f"Summary: {len(self._by_type['text'])} text chunks, {len(self._by_type['table'])} table chunks, {len(self._by_type['image'])} image chunks.")
         return self.chunks
 
     # --- GETTER METHODS ---
     def get_text_chunks(self) -> List[DocumentChunk]:
         """Returns only the text chunks from the last parsed document."""
-        return [chunk for chunk in self.chunks if chunk.type == 'text']
+        return list(self._by_type['text'])
 
     def get_table_chunks(self) -> List[DocumentChunk]:
         """Returns only the table chunks from the last parsed document."""
-        return [chunk for chunk in self.chunks if chunk.type == 'table']
+        return list(self._by_type['table'])
 
     def get_image_chunks(self) -> List[DocumentChunk]:
         """Returns only the image chunks from the last parsed document."""
-        return [chunk for chunk in self.chunks if chunk.type == 'image']
+        return list(self._by_type['image'])
 
     # --- SAVER METHODS ---
+    def _images_for(self, file_path: Path, item_type: type) -> List[Tuple[Any, "Image"]]:
+        """
+        Returns the (element, image) pairs of the given item type for a document. The images
+        cached by parse() are reused when it processed this document; otherwise they are
+        rendered from the document, leaving the parsed chunks untouched.
+        """
+        # _doc_path is not enough: it is also set when a document is only loaded (e.g. for Markdown).
+        if self._parsed_path == file_path:
+            return self._tables if item_type is TableItem else self._pictures
+        doc = self._load_and_get_doc(file_path)
+        return [(element, element.get_image(doc)) for element, _ in doc.iterate_items() if isinstance(element, item_type)]
+
+    def _save_images(self, images: List[Tuple["Image", Path]]):
+        """Encodes the given images to their PNG files in parallel worker processes."""
+        def _jobs():
+            for image, save_path in images:
+                logger.debug(f"Saving image to {save_path}")
+                yield image, save_path
+
+        _run_encode_jobs(_encode_png, _jobs())
+
+    @staticmethod
+    def _numbered_paths(items: List[Tuple[Any, "Image"]], output_dir: Path, file_prefix: str) -> List[Tuple["Image", Path]]:
+        """Pairs each cached image with its numbered output path (e.g. 'doc-table-1.png')."""
+        return [
+            (image, output_dir / f"{file_prefix}-{counter}.png")
+            for counter, (_element, image) in enumerate(items, start=1)
+        ]
+
+    def parse_and_export(
+        self,
+        file_path: str | Path,
+        output_dir: str | Path,
+        save_tables: bool = True,
+        save_pictures: bool = True,
+    ) -> Tuple[List[DocumentChunk], Path]:
+        """
+        Parses the document and saves its tables and pictures as PNG images with a
+        single walk of the document tree. Each image is rendered once and shared by
+        its chunk and its exported file.
+
+        Args:
+            file_path (str | Path): The path to the PDF to be processed.
+            output_dir (str | Path): The directory where the images are saved.
+            save_tables (bool): Whether to save the tables as images.
+            save_pictures (bool): Whether to save the pictures as images.
+
+        Returns:
+            Tuple[List[DocumentChunk], Path]: The extracted chunks and the output directory.
+        """
+        if isinstance(file_path, str):
+            file_path = Path(file_path)
+        if isinstance(output_dir, str):
+            output_dir = Path(output_dir)
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        chunks = self.parse(file_path)
+        doc_filename = file_path.stem
+
+        images: List[Tuple["Image", Path]] = []
+        if save_tables:
+            images += self._numbered_paths(self._tables, output_dir, f"{doc_filename}-table")
+        if save_pictures:
+            images += self._numbered_paths(self._pictures, output_dir, f"{doc_filename}-picture")
+        self._save_images(images)
+        logger.info(f"Saved {len(images)} tables and pictures as images to '{output_dir}'.")
+        return chunks, output_dir
+
     def save_tables_as_images(self, file_path: str | Path, output_dir: str | Path):
-        """Finds all tables in the document and saves them as PNG images."""
+        """
+        Saves the tables of the document as PNG images, reusing the images rendered
+        by parse() when it processed this document. Other documents are rendered
+        without replacing the parsed chunks. Deprecated: use parse_and_export() instead.
+        """
+        warnings.warn(
+            "save_tables_as_images() is deprecated, use parse_and_export() instead.",
+            DeprecationWarning, stacklevel=2
+        )
         if isinstance(file_path, str):
             file_path = Path(file_path)
         if isinstance(output_dir, str):
             output_dir = Path(output_dir)
-            
+
         output_dir.mkdir(parents=True, exist_ok=True)
-        doc = self._load_and_get_doc(file_path)
+        items = self._images_for(file_path, TableItem)
         doc_filename = file_path.stem
-        
-        table_counter = 0
-        for element, _ in doc.iterate_items():
-            if isinstance(element, TableItem):
-                table_counter += 1
-                image = element.get_image(doc)
-                save_path = output_dir / f"{doc_filename}-table-{table_counter}.png"
-                image.save(save_path, "PNG")
-                logger.debug(f"Saved table image to {save_path}")
-        logger.info(f"Saved {table_counter} tables as images to '{output_dir}'.")
+
+        self._save_images(self._numbered_paths(items, output_dir, f"{doc_filename}-table"))
+        logger.info(f"Saved {len(items)} tables as images to '{output_dir}'.")
 
     def save_pictures_as_images(self, file_path: str | Path, output_dir: str | Path):
-        """Finds all pictures in the document and saves them as PNG images."""
+        """
+        Saves the pictures of the document as PNG images, reusing the images rendered
+        by parse() when it processed this document. Other documents are rendered
+        without replacing the parsed chunks. Deprecated: use parse_and_export() instead.
+        """
+        warnings.warn(
+            "save_pictures_as_images() is deprecated, use parse_and_export() instead.",
+            DeprecationWarning, stacklevel=2
+        )
         if isinstance(file_path, str):
             file_path = Path(file_path)
         if isinstance(output_dir, str):
             output_dir = Path(output_dir)
-            
+
         output_dir.mkdir(parents=True, exist_ok=True)
-        doc = self._load_and_get_doc(file_path)
+        items = self._images_for(file_path, PictureItem)
         doc_filename = file_path.stem
-        
-        picture_counter = 0
-        for element, _ in doc.iterate_items():
-            if isinstance(element, PictureItem):
-                picture_counter += 1
-                image = element.get_image(doc)
-                save_path = output_dir / f"{doc_filename}-picture-{picture_counter}.png"
-                image.save(save_path, "PNG")
-                logger.debug(f"Saved picture image to {save_path}")
-        logger.info(f"Saved {picture_counter} pictures as images to '{output_dir}'.")
 
-    def reconstruct_to_markdown(self, file_path: str | Path) -> str:
+        self._save_images(self._numbered_paths(items, output_dir, f"{doc_filename}-picture"))
+        logger.info(f"Saved {len(items)} pictures as images to '{output_dir}'.")
+
+    @staticmethod
+    def _write_markdown(doc: DocItem, output_path: Path):
+        """Writes the document as Markdown with embedded images, removing any partial file on failure."""
+        from docling_core.types.doc import ImageRefMode
+        try:
+            doc.save_as_markdown(output_path, image_mode=ImageRefMode.EMBEDDED)
+        except Exception:
+            output_path.unlink(missing_ok=True)
+            raise
+
+    def reconstruct_to_markdown_file(self, file_path: str | Path, output_path: str | Path) -> Path:
         """
-        Reconstructs the PDF into a single Markdown file, with images embedded as base64.
-        This method uses a temporary file because the underlying library function
-        requires writing to a disk path.
+        Reconstructs the PDF into a Markdown file, with images embedded as base64,
+        written by Docling directly to `output_path`. The Markdown is never held
+        in memory as a single string, which matters for figure-heavy documents.
+        If writing fails, no partial file is left at `output_path`.
+
+        Args:
+            file_path (str | Path): The path to the PDF to be processed.
+            output_path (str | Path): The path of the Markdown file to write.
+
+        Returns:
+            Path: The path of the written Markdown file.
         """
-        from docling_core.types.doc import ImageRefMode
         if isinstance(file_path, str):
             file_path = Path(file_path)
+        if isinstance(output_path, str):
+            output_path = Path(output_path)
 
         doc = self._load_and_get_doc(file_path)
-        
-        try:
-            with tempfile.NamedTemporaryFile(mode='w+', suffix='.md', delete=True, encoding='utf-8') as temp_md_file:
-                temp_path = temp_md_file.name
-                logger.info(f"Usando fichero temporal para la reconstrucción de Markdown: {temp_path}")
-                
-                doc.save_as_markdown(temp_path, image_mode=ImageRefMode.EMBEDDED)
-                
-                temp_md_file.seek(0)
-                markdown_content = temp_md_file.read()
-
-            logger.info(f"Reconstrucción a Markdown completada y leída desde el fichero temporal.")
-            return markdown_content
 
+        try:
+            self._write_markdown(doc, output_path)
+            logger.info(f"Reconstrucción a Markdown completada en: {output_path}")
+            return output_path
         except Exception as e:
             logger.error(f"Ocurrió un error durante la reconstrucción a Markdown: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def reconstruct_to_markdown(self, file_path: str | Path) -> str:
+        """
+        Reconstructs the PDF into a single Markdown string, with images embedded as base64.
+        Prefer reconstruct_to_markdown_file() when the result is going to be written to disk.
+        This method writes to a temporary file, placed in the /dev/shm tmpfs on Linux
+        so the round-trip stays in memory, and reads it back. /dev/shm is often small
+        (64 MB in Docker by default), so if writing there fails the default temporary
+        directory is used instead.
+        """
+        if isinstance(file_path, str):
+            file_path = Path(file_path)
+
+        doc = self._load_and_get_doc(file_path)
+
+        shm_dir = Path("/dev/shm")
+        base_dirs = [shm_dir, None] if shm_dir.is_dir() else [None]
+        for base_dir in base_dirs:
+            temp_dir = None
+            try:
+                temp_dir = tempfile.mkdtemp(dir=base_dir)
+                temp_path = Path(temp_dir) / f"{file_path.stem}.md"
+                logger.info(f"Usando fichero temporal para la reconstrucción de Markdown: {temp_path}")
+                self._write_markdown(doc, temp_path)
+                markdown_content = temp_path.read_text(encoding='utf-8')
+                logger.info(f"Reconstrucción a Markdown completada y leída desde el fichero temporal.")
+                return markdown_content
+            except OSError as e:
+                if base_dir is not None:
+                    logger.warning(f"No se pudo usar {base_dir} ({e}), reintentando en el directorio temporal por defecto.")
+                    continue
+                logger.error(f"Ocurrió un error durante la reconstrucción a Markdown: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Ocurrió un error durante la reconstrucción a Markdown: {e}")
+                raise
+            finally:
+                if temp_dir is not None:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
@@ -1 +1 @@
-from multimodal_summarizer import MultimodalSummarizer
\ No newline at end of file
+from .multimodal_summarizer import MultimodalSummarizer
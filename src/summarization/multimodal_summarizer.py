@@ -1,14 +1,51 @@
 # src/summarization/multimodal_summarizer.py
 
+import asyncio
 import logging
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 from src.llm.ollama_client import OllamaClient
 from src.processing.parsers.base_parser import DocumentChunk
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=32)
+def _load_prompt_file(prompt_path: Path, mtime_ns: int) -> str:
+    """
+    Reads a prompt template file. Cached per path and modification time, so each
+    version of a file is read once per process and edited prompts are picked up.
+    """
+    with open(prompt_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+# Marker the LLM is asked to put before each description when several images share one call
+BATCH_MARKER = "[[IMAGE {index}]]"
+_BATCH_MARKER_RE = re.compile(r"\[\[IMAGE (\d+)\]\]")
+
+def _split_batch_response(response: str, expected: int) -> Optional[List[str]]:
+    """
+    Splits a multi-image response into one summary per image, matched by the index
+    in each marker rather than by position.
+
+    Args:
+        response (str): The LLM response containing BATCH_MARKER-separated descriptions.
+        expected (int): The number of images sent in the batch.
+
+    Returns:
+        Optional[List[str]]: The summaries ordered by image index, or None when the markers
+                             are not exactly 1..expected, each appearing once.
+    """
+    # With a capturing group, re.split alternates text and indices: [preamble, index, text, index, text, ...]
+    pieces = _BATCH_MARKER_RE.split(response)
+    indices = [int(index) for index in pieces[1::2]]
+    if sorted(indices) != list(range(1, expected + 1)):
+        return None
+    parts = dict(zip(indices, (part.strip() for part in pieces[2::2])))
+    return [parts[index] for index in range(1, expected + 1)]
+
 class MultimodalSummarizer:
     """
     Generates summaries of DocumentChunks using an LLM client and external prompt templates.
@@ -24,12 +61,15 @@ class MultimodalSummarizer:
         """
         self.llm_client = llm_client
         self.prompt_templates = prompt_templates
-        self.loaded_prompts = {} # Cache to avoid reading the same file multiple times
+        # Load every template up front so summarizing never touches the disk
+        for prompt_type in self.prompt_templates:
+            self._load_prompt(prompt_type)
         logger.info("Multimodal Summarizer initialized with external prompt templates.")
 
     def _load_prompt(self, prompt_type: str) -> str:
         """
-        Loads a prompt template from a file, using a simple cache.
+        Loads a prompt template from a file, cached per path and modification time
+        across all summarizers.
 
         Args:
             prompt_type (str): The type of prompt to load ('text', 'image', 'table').
@@ -37,52 +77,169 @@ class MultimodalSummarizer:
         Returns:
             str: The content of the prompt template.
         """
-        if prompt_type in self.loaded_prompts:
-            return self.loaded_prompts[prompt_type]
-
         prompt_path = self.prompt_templates.get(prompt_type)
-        if not prompt_path or not prompt_path.exists():
+        if not prompt_path:
             logger.error(f"Prompt template not found for type '{prompt_type}' at path: {prompt_path}")
             # Return a generic prompt as fallback
             return "Summarize the following content as best as possible:"
 
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                prompt_content = f.read()
-            self.loaded_prompts[prompt_type] = prompt_content
-            logger.debug(f"Prompt template for '{prompt_type}' loaded from {prompt_path}")
-            return prompt_content
+            prompt_path = Path(prompt_path)
+            return _load_prompt_file(prompt_path, prompt_path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            logger.error(f"Prompt template not found for type '{prompt_type}' at path: {prompt_path}")
+            return "Summarize the following content as best as possible:"
         except Exception as e:
             logger.error(f"Error reading prompt file {prompt_path}: {e}")
             return "Summarize the following content:"
 
-    def summarize_chunk(self, chunk: DocumentChunk) -> str:
+    def _build_request(self, chunk: DocumentChunk) -> Tuple[str, Optional[List[str]]]:
         """
-        Takes a DocumentChunk, generates a prompt from a template, and obtains a summary.
+        Builds the prompt and the list of base64 images to send to the LLM for a chunk.
 
         Args:
             chunk (DocumentChunk): The document chunk to be summarized.
 
         Returns:
-            str: The generated summary.
+            Tuple[str, Optional[List[str]]]: The prompt and the images (None for text chunks).
         """
-        logger.debug(f"Generating summary for chunk of type '{chunk.type}' on page {chunk.source_page}.")
-        
         prompt_template = self._load_prompt(chunk.type)
         
-        # The content of 'image' and 'table' chunks is the image in base64.
+        # The content of 'image' and 'table' chunks is an image, only encoded to base64 here.
         # In your pdf_parser.py, you had also converted tables into images.
-        images_b64 = [chunk.content] if chunk.type in ('image', 'table') else None
+        images_b64 = [chunk.as_base64()] if chunk.type in ('image', 'table') else None
 
         if chunk.type == 'text':
-            prompt = prompt_template.format(text_content=chunk.content)
+            # A plain replace of the single placeholder is cheaper than str.format
+            prompt = prompt_template.replace("{text_content}", chunk.content, 1)
         else: # For 'image' and 'table'
             prompt = prompt_template
             # Optionally, add caption context if it exists
             if caption := chunk.metadata.get("caption"):
                 prompt += f"\nAdditional caption context: '{caption}'"
+        return prompt, images_b64
+
+    def summarize_chunk(self, chunk: DocumentChunk) -> str:
+        """
+        Takes a DocumentChunk, generates a prompt from a template, and obtains a summary.
+
+        Args:
+            chunk (DocumentChunk): The document chunk to be summarized.
 
+        Returns:
+            str: The generated summary.
+        """
+        logger.debug(f"Generating summary for chunk of type '{chunk.type}' on page {chunk.source_page}.")
+        
+        prompt, images_b64 = self._build_request(chunk)
         summary = self.llm_client.generate_response(prompt, images_base64=images_b64)
         
         logger.info(f"Summary generated for chunk of type '{chunk.type}': '{summary[:100]}...'")
         return summary
+
+    async def summarize_chunks(self, chunks: List[DocumentChunk], concurrency: int = 8) -> List[str]:
+        """
+        Summarizes several chunks concurrently, keeping up to `concurrency` requests
+        to the LLM in flight instead of waiting for each round-trip in turn.
+
+        Args:
+            chunks (List[DocumentChunk]): The document chunks to be summarized.
+            concurrency (int): The maximum number of simultaneous LLM requests.
+
+        Returns:
+            List[str]: The generated summaries, in the same order as `chunks`.
+
+        Raises:
+            ValueError: If `concurrency` is lower than 1.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _one(chunk: DocumentChunk) -> str:
+            async with semaphore:
+                # Building the request may encode the chunk's image, so keep it off the event loop
+                prompt, images_b64 = await asyncio.to_thread(self._build_request, chunk)
+                summary = await self.llm_client.agenerate_response(prompt, images_base64=images_b64)
+                logger.info(f"Summary generated for chunk of type '{chunk.type}': '{summary[:100]}...'")
+                return summary
+
+        logger.info(f"Summarizing {len(chunks)} chunks with up to {concurrency} concurrent requests.")
+        return await asyncio.gather(*(_one(chunk) for chunk in chunks))
+
+    def _build_batch_prompt(self, chunks: List[DocumentChunk]) -> str:
+        """
+        Builds a single prompt asking for one description per image, each preceded
+        by its BATCH_MARKER so the response can be split back into summaries.
+
+        Args:
+            chunks (List[DocumentChunk]): Image or table chunks, all of the same type.
+
+        Returns:
+            str: The prompt for the whole batch.
+        """
+        prompt = self._load_prompt(chunks[0].type)
+        prompt += (
+            f"\n\nYou are given {len(chunks)} images. Apply the instructions above to each image separately. "
+            f"Start the description of each image with a line containing only its marker, "
+            f"from {BATCH_MARKER.format(index=1)} to {BATCH_MARKER.format(index=len(chunks))}, "
+            f"in the same order as the images."
+        )
+        for index, chunk in enumerate(chunks, start=1):
+            if caption := chunk.metadata.get("caption"):
+                prompt += f"\nAdditional caption context for image {index}: '{caption}'"
+        return prompt
+
+    def summarize_chunks_batched(self, chunks: List[DocumentChunk], batch_size: int = 4) -> List[str]:
+        """
+        Summarizes chunks, sending up to `batch_size` consecutive image or table chunks
+        of the same type to the LLM in a single multi-image call. This amortizes the
+        per-call cost of the vision model for models that accept several images
+        (e.g. llava, minicpm-v). Text chunks, and batches whose response does not
+        contain each image marker exactly once, are summarized one chunk at a time.
+
+        Args:
+            chunks (List[DocumentChunk]): The document chunks to be summarized.
+            batch_size (int): The maximum number of images sent in one call.
+
+        Returns:
+            List[str]: The generated summaries, in the same order as `chunks`.
+
+        Raises:
+            ValueError: If `batch_size` is lower than 1.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        summaries: List[str] = []
+        batch: List[DocumentChunk] = []
+
+        def _flush():
+            if len(batch) == 1:
+                summaries.append(self.summarize_chunk(batch[0]))
+            elif batch:
+                prompt = self._build_batch_prompt(batch)
+                images_b64 = [chunk.as_base64() for chunk in batch]
+                response = self.llm_client.generate_response(prompt, images_base64=images_b64)
+                parts = _split_batch_response(response, len(batch))
+                if parts is not None:
+                    logger.info(f"Batch summary generated for {len(batch)} chunks of type '{batch[0].type}'.")
+                    summaries.extend(parts)
+                else:
+                    logger.warning(
+                        f"Malformed batch response (markers are not exactly 1..{len(batch)}), "
+                        f"falling back to one call per chunk."
+                    )
+                    summaries.extend(self.summarize_chunk(chunk) for chunk in batch)
+            batch.clear()
+
+        for chunk in chunks:
+            if chunk.type == 'text':
+                _flush()
+                summaries.append(self.summarize_chunk(chunk))
+                continue
+            if batch and (batch[0].type != chunk.type or len(batch) >= batch_size):
+                _flush()
+            batch.append(chunk)
+        _flush()
+
+        return summaries
@@ -0,0 +1,37 @@
+"""
+Shared test setup. Makes the project importable from the tests and, when the
+heavy runtime dependencies are not installed, registers minimal stand-ins for
+the names the modules under test import, so the pure-Python logic can be tested.
+"""
+import sys
+import types
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def _register_stub(name: str, **attrs):
+    module = types.ModuleType(name)
+    for attr_name, value in attrs.items():
+        setattr(module, attr_name, value)
+    sys.modules[name] = module
+    return module
+
+
+try:
+    import docling_core.types.doc  # noqa: F401
+except ImportError:
+    _register_stub("docling_core")
+    _register_stub("docling_core.types")
+    _register_stub(
+        "docling_core.types.doc",
+        ImageRefMode=types.SimpleNamespace(EMBEDDED="embedded"),
+        **{name: type(name, (), {}) for name in ("DocItem", "TextItem", "TitleItem", "TableItem", "PictureItem")},
+    )
+
+try:
+    import ollama  # noqa: F401
+except ImportError:
+    _register_stub("ollama", Client=None)
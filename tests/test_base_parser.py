@@ -0,0 +1,58 @@
+import base64
+import io
+
+import pytest
+
+from src.processing.parsers.base_parser import DocumentChunk
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def decode(image_b64):
+    return Image.open(io.BytesIO(base64.b64decode(image_b64)))
+
+
+def test_picture_chunks_are_encoded_as_jpeg():
+    chunk = DocumentChunk(content=Image.new("RGB", (8, 8), "red"), type="image", source_page=1, metadata={})
+
+    assert decode(chunk.as_base64()).format == "JPEG"
+
+
+def test_table_chunks_are_encoded_as_lossless_png():
+    image = Image.new("RGB", (8, 8), "blue")
+    chunk = DocumentChunk(content=image, type="table", source_page=1, metadata={})
+
+    decoded = decode(chunk.as_base64())
+
+    assert decoded.format == "PNG"
+    assert decoded.tobytes() == image.tobytes()
+
+
+def test_rgba_pictures_are_encoded_without_error():
+    chunk = DocumentChunk(content=Image.new("RGBA", (8, 8), (0, 255, 0, 128)), type="image", source_page=1, metadata={})
+
+    decoded = decode(chunk.as_base64())
+
+    assert (decoded.format, decoded.mode) == ("JPEG", "RGB")
+
+
+def test_encoding_is_memoized():
+    chunk = DocumentChunk(content=Image.new("RGB", (8, 8)), type="image", source_page=1, metadata={})
+
+    assert chunk.as_base64() is chunk.as_base64()
+
+
+def test_string_content_is_returned_as_is():
+    chunk = DocumentChunk(content="already-base64", type="image", source_page=1, metadata={})
+
+    assert chunk.as_base64() == "already-base64"
+
+
+def test_consecutive_encodes_of_different_sizes_decode_correctly():
+    large = Image.effect_noise((256, 256), 64).convert("RGB")
+    small = Image.new("RGB", (4, 4), "green")
+    chunks = [DocumentChunk(content=image, type="table", source_page=1, metadata={}) for image in (large, small, large)]
+
+    decoded = [decode(chunk.as_base64()) for chunk in chunks]
+
+    assert [d.tobytes() for d in decoded] == [large.tobytes(), small.tobytes(), large.tobytes()]
@@ -0,0 +1,110 @@
+import pickle
+
+import pytest
+
+from src.processing.parsers import pdf_parser
+from src.processing.parsers.pdf_parser import PdfParser
+
+
+class CachedDoc:
+    """Picklable stand-in for a converted Docling document."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def iterate_items(self):
+        return iter(())
+
+
+class CountingConverter:
+    def __init__(self):
+        self.calls = 0
+
+    def convert(self, source):
+        self.calls += 1
+        return type("ConversionResult", (), {"document": CachedDoc(source)})()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(pdf_parser, "DOC_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(pdf_parser, "_docling_version", lambda: "1.0")
+    # The in-process memo of cache reads is global
+    pdf_parser._load_cached_doc.cache_clear()
+    yield cache_dir
+    pdf_parser._load_cached_doc.cache_clear()
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    return path
+
+
+def make_parser(**kwargs):
+    parser = PdfParser(**kwargs)
+    parser.converter = CountingConverter()
+    return parser
+
+
+def test_second_parse_of_the_same_file_is_a_cache_hit(cache_dir, pdf_file):
+    first, second = make_parser(), make_parser()
+
+    first.parse(pdf_file)
+    second.parse(pdf_file)
+
+    assert (first.converter.calls, second.converter.calls) == (1, 0)
+    assert second._doc.name == str(pdf_file)
+
+
+def test_corrupt_cache_entry_falls_back_to_conversion(cache_dir, pdf_file):
+    make_parser().parse(pdf_file)
+    [cache_file] = cache_dir.glob("*.pickle")
+    cache_file.write_bytes(b"not a pickle")
+    pdf_parser._load_cached_doc.cache_clear()
+
+    parser = make_parser()
+    parser.parse(pdf_file)
+
+    assert parser.converter.calls == 1
+    # The entry is rewritten with the fresh conversion
+    with open(cache_file, "rb") as f:
+        assert pickle.load(f).name == str(pdf_file)
+
+
+def test_failed_cache_write_leaves_no_temporary_file(cache_dir, pdf_file, monkeypatch):
+    def failing_dump(obj, f, protocol=None):
+        f.write(b"partial")
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(pdf_parser.pickle, "dump", failing_dump)
+    parser = make_parser()
+
+    parser.parse(pdf_file)
+
+    assert parser.converter.calls == 1
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_cache_key_depends_on_image_scale_and_docling_version(cache_dir, pdf_file, monkeypatch):
+    make_parser(image_resolution_scale=2.0).parse(pdf_file)
+
+    rescaled = make_parser(image_resolution_scale=1.0)
+    rescaled.parse(pdf_file)
+    monkeypatch.setattr(pdf_parser, "_docling_version", lambda: "2.0")
+    upgraded = make_parser(image_resolution_scale=2.0)
+    upgraded.parse(pdf_file)
+
+    assert (rescaled.converter.calls, upgraded.converter.calls) == (1, 1)
+    assert len(list(cache_dir.glob("*.pickle"))) == 3
+
+
+def test_disabled_cache_always_converts(cache_dir, pdf_file):
+    parser = make_parser(enable_cache=False)
+
+    parser.parse(pdf_file)
+
+    assert parser.converter.calls == 1
+    assert not cache_dir.exists()
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from src.processing.parsers.base_parser import DocumentChunk
+from src.summarization.multimodal_summarizer import MultimodalSummarizer
+
+
+class FakeLLMClient:
+    """Records every call and answers with a canned response per number of images."""
+
+    def __init__(self, batch_response=None):
+        self.batch_response = batch_response
+        self.calls = []
+
+    def generate_response(self, prompt, images_base64=None):
+        self.calls.append(list(images_base64 or []))
+        if images_base64 and len(images_base64) > 1:
+            return self.batch_response
+        return f"summary of {images_base64[0] if images_base64 else 'text'}"
+
+    async def agenerate_response(self, prompt, images_base64=None):
+        return self.generate_response(prompt, images_base64)
+
+
+@pytest.fixture
+def prompt_templates(tmp_path):
+    templates = {}
+    for prompt_type, content in (("text", "Summarize: {text_content}"), ("image", "Describe."), ("table", "Transcribe.")):
+        path = tmp_path / f"{prompt_type}.txt"
+        path.write_text(content, encoding="utf-8")
+        templates[prompt_type] = path
+    return templates
+
+
+def image_chunk(name, chunk_type="image"):
+    # Parsers may hand over already encoded images as a base64 string
+    return DocumentChunk(content=name, type=chunk_type, source_page=1, metadata={})
+
+
+def test_summarize_chunks_keeps_input_order(prompt_templates):
+    summarizer = MultimodalSummarizer(FakeLLMClient(), prompt_templates)
+    chunks = [image_chunk("a"), DocumentChunk("some text", "text", 1, {}), image_chunk("b", "table")]
+
+    summaries = asyncio.run(summarizer.summarize_chunks(chunks, concurrency=2))
+
+    assert summaries == ["summary of a", "summary of text", "summary of b"]
+
+
+def test_summarize_chunks_rejects_non_positive_concurrency(prompt_templates):
+    summarizer = MultimodalSummarizer(FakeLLMClient(), prompt_templates)
+
+    with pytest.raises(ValueError):
+        asyncio.run(summarizer.summarize_chunks([image_chunk("a")], concurrency=0))
+
+
+def test_batched_response_is_matched_to_images_by_marker_index(prompt_templates):
+    llm = FakeLLMClient(batch_response="Sure!\n[[IMAGE 2]]\nB\n[[IMAGE 1]]\nA\n[[IMAGE 3]]\nC")
+    summarizer = MultimodalSummarizer(llm, prompt_templates)
+
+    summaries = summarizer.summarize_chunks_batched([image_chunk("a"), image_chunk("b"), image_chunk("c")])
+
+    assert summaries == ["A", "B", "C"]
+    assert llm.calls == [["a", "b", "c"]]
+
+
+@pytest.mark.parametrize("response", [
+    "[[IMAGE 1]] A, unlike [[IMAGE 2]] ... [[IMAGE 2]] B",  # marker repeated inside a description
+    "[[IMAGE 1]] A [[IMAGE 3]] C",                          # marker missing
+    "A and B without markers",
+])
+def test_malformed_batched_response_falls_back_to_single_calls(prompt_templates, response):
+    llm = FakeLLMClient(batch_response=response)
+    summarizer = MultimodalSummarizer(llm, prompt_templates)
+
+    summaries = summarizer.summarize_chunks_batched([image_chunk("a"), image_chunk("b")])
+
+    assert summaries == ["summary of a", "summary of b"]
+    assert llm.calls == [["a", "b"], ["a"], ["b"]]
+
+
+def test_batches_group_consecutive_chunks_of_the_same_type(prompt_templates):
+    llm = FakeLLMClient(batch_response="[[IMAGE 1]] X [[IMAGE 2]] Y")
+    summarizer = MultimodalSummarizer(llm, prompt_templates)
+    chunks = [
+        image_chunk("a"), image_chunk("b"), image_chunk("c"),
+        DocumentChunk("some text", "text", 1, {}),
+        image_chunk("t1", "table"),
+    ]
+
+    summaries = summarizer.summarize_chunks_batched(chunks, batch_size=2)
+
+    assert summaries == ["X", "Y", "summary of c", "summary of text", "summary of t1"]
+    assert llm.calls == [["a", "b"], ["c"], [], ["t1"]]
+
+
+def test_summarize_chunks_builds_requests_off_the_event_loop(prompt_templates, monkeypatch):
+    summarizer = MultimodalSummarizer(FakeLLMClient(), prompt_templates)
+    build_request = summarizer._build_request
+    threads = []
+
+    def recording_build_request(chunk):
+        threads.append(threading.get_ident())
+        return build_request(chunk)
+
+    monkeypatch.setattr(summarizer, "_build_request", recording_build_request)
+
+    asyncio.run(summarizer.summarize_chunks([image_chunk("a"), image_chunk("b")]))
+
+    assert len(threads) == 2
+    assert threading.get_ident() not in threads
+
+
+def test_edited_prompt_files_are_reloaded(prompt_templates):
+    path = prompt_templates["image"]
+    assert MultimodalSummarizer(FakeLLMClient(), prompt_templates)._load_prompt("image") == "Describe."
+
+    path.write_text("Describe in detail.", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert MultimodalSummarizer(FakeLLMClient(), prompt_templates)._load_prompt("image") == "Describe in detail."
+
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_summarize_chunks_batched_rejects_non_positive_batch_size(prompt_templates, batch_size):
+    summarizer = MultimodalSummarizer(FakeLLMClient(), prompt_templates)
+
+    with pytest.raises(ValueError):
+        summarizer.summarize_chunks_batched([image_chunk("a")], batch_size=batch_size)
@@ -0,0 +1,244 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from src.processing.parsers import pdf_parser
+from src.processing.parsers.pdf_parser import PdfParser
+
+
+class FakeProv:
+    def __init__(self, page_no):
+        self.page_no = page_no
+
+
+class FakeText:
+    def __init__(self, text, page_no=1):
+        self.text = text
+        self.prov = [FakeProv(page_no)]
+        self.self_ref = f"#/texts/{text}"
+
+
+class FakeFloatingItem:
+    def __init__(self, name, page_no=1):
+        self.name = name
+        self.prov = [FakeProv(page_no)]
+        self.self_ref = f"#/tables/{name}"
+
+    def get_image(self, doc):
+        return f"image-of-{doc.name}-{self.name}"
+
+    def caption_text(self, doc):
+        return f"caption {self.name}"
+
+
+class FakeTable(FakeFloatingItem):
+    pass
+
+
+class FakePicture(FakeFloatingItem):
+    pass
+
+
+class FakeDoc:
+    def __init__(self, name, elements):
+        self.name = name
+        self.elements = elements
+
+    def iterate_items(self):
+        for element in self.elements:
+            yield element, 0
+
+
+class FakeParser(PdfParser):
+    """PdfParser that understands the fake element types and loads documents from memory."""
+    _DISPATCH = {
+        FakeText: PdfParser._handle_text,
+        FakeTable: PdfParser._handle_table,
+        FakePicture: PdfParser._handle_picture,
+    }
+
+    def __init__(self, docs):
+        super().__init__(enable_cache=False)
+        self.docs = docs
+        self.loads = []
+
+    def _load_and_get_doc(self, file_path):
+        if self._doc is None or self._doc_path != file_path:
+            self.loads.append(file_path.name)
+            self._doc = self.docs[file_path.name]
+            self._doc_path = file_path
+        return self._doc
+
+
+@pytest.fixture
+def parser(monkeypatch):
+    # The savers pick tables and pictures out of a document by type
+    monkeypatch.setattr(pdf_parser, "TableItem", FakeTable)
+    monkeypatch.setattr(pdf_parser, "PictureItem", FakePicture)
+    docs = {
+        "a.pdf": FakeDoc("a", [FakeText("intro"), FakeTable("t1"), FakePicture("p1", page_no=2), FakeText("  ")]),
+        "b.pdf": FakeDoc("b", [FakeTable("t1"), FakeTable("t2")]),
+    }
+    parser = FakeParser(docs)
+    saved = []
+    monkeypatch.setattr(parser, "_save_images", lambda images: saved.extend(images))
+    parser.saved = saved
+    return parser
+
+
+def test_parse_builds_chunks_in_document_order(parser):
+    chunks = parser.parse("a.pdf")
+
+    assert [(c.type, c.source_page) for c in chunks] == [("text", 1), ("table", 1), ("image", 2)]
+    assert chunks[1].content == "image-of-a-t1"
+    assert chunks[2].metadata == {"caption": "caption p1"}
+
+
+def test_save_tables_after_markdown_load_renders_the_images(parser, tmp_path):
+    # Loading the document without parsing it must not count as parsed
+    parser._load_and_get_doc(Path("a.pdf"))
+
+    with pytest.warns(DeprecationWarning):
+        parser.save_tables_as_images("a.pdf", tmp_path)
+
+    assert parser.saved == [("image-of-a-t1", tmp_path / "a-table-1.png")]
+
+
+def test_save_pictures_never_reuses_another_documents_images(parser, tmp_path):
+    parser.parse("a.pdf")
+    parser._load_and_get_doc(Path("b.pdf"))
+
+    with pytest.warns(DeprecationWarning):
+        parser.save_tables_as_images("b.pdf", tmp_path)
+
+    assert parser.saved == [
+        ("image-of-b-t1", tmp_path / "b-table-1.png"),
+        ("image-of-b-t2", tmp_path / "b-table-2.png"),
+    ]
+    # Saving another document's images leaves the parsed chunks alone
+    assert [c.content for c in parser.get_text_chunks()] == ["intro"]
+    assert parser.get_table_chunks()[0].content == "image-of-a-t1"
+
+
+def test_save_after_parse_reuses_cached_images(parser, tmp_path):
+    parser.parse("a.pdf")
+
+    with pytest.warns(DeprecationWarning):
+        parser.save_pictures_as_images("a.pdf", tmp_path)
+
+    assert parser.loads == ["a.pdf"]
+    assert parser.saved == [("image-of-a-p1", tmp_path / "a-picture-1.png")]
+
+
+class MarkdownDoc(FakeDoc):
+    """Writes Markdown like Docling, failing partway for paths under `full_dir`."""
+
+    def __init__(self, full_dir):
+        super().__init__("md", [])
+        self.full_dir = full_dir
+        self.written_to = []
+
+    def save_as_markdown(self, filename, image_mode=None):
+        self.written_to.append(filename)
+        filename.write_text("# partial", encoding="utf-8")
+        if str(filename).startswith(self.full_dir):
+            raise OSError(28, "No space left on device")
+        filename.write_text("# markdown", encoding="utf-8")
+
+
+def test_reconstruct_to_markdown_falls_back_when_shm_is_full(parser, caplog):
+    doc = parser.docs["md.pdf"] = MarkdownDoc("/dev/shm")
+
+    with caplog.at_level(logging.INFO):
+        assert parser.reconstruct_to_markdown("md.pdf") == "# markdown"
+
+    assert not any(path.exists() for path in doc.written_to)
+    # A successful fallback is not an error
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
+
+
+def test_failed_markdown_file_is_removed(parser, tmp_path, caplog):
+    parser.docs["md.pdf"] = MarkdownDoc(str(tmp_path))
+    output_path = tmp_path / "md.md"
+
+    with pytest.raises(OSError):
+        parser.reconstruct_to_markdown_file("md.pdf", output_path)
+
+    assert not output_path.exists()
+    assert any(record.levelno == logging.ERROR for record in caplog.records)
+
+
+def test_subclass_dispatch_does_not_reuse_parent_resolutions():
+    class SpecialTable(FakeTable):
+        pass
+
+    def handle_special(self, element, doc, page_num):
+        return None
+
+    class SpecialParser(FakeParser):
+        _DISPATCH = {**FakeParser._DISPATCH, SpecialTable: handle_special}
+
+    # The parent resolves the subtype to its table handler first
+    assert FakeParser._handler_for(SpecialTable) is PdfParser._handle_table
+    assert SpecialParser._handler_for(SpecialTable) is handle_special
+
+
+def test_getters_return_copies_of_the_type_buckets(parser):
+    parser.parse("a.pdf")
+
+    parser.get_text_chunks().clear()
+    parser.get_table_chunks().append(parser.chunks[0])
+
+    assert [c.type for c in parser.get_text_chunks()] == ["text"]
+    assert [c.type for c in parser.get_table_chunks()] == ["table"]
+    assert len(parser.get_image_chunks()) == 1
+
+
+def test_parse_and_export_saves_tables_and_pictures_from_one_walk(parser, tmp_path):
+    output_dir = tmp_path / "out"
+
+    chunks, exported_to = parser.parse_and_export("a.pdf", output_dir)
+
+    assert exported_to == output_dir and output_dir.is_dir()
+    assert [c.type for c in chunks] == ["text", "table", "image"]
+    assert parser.loads == ["a.pdf"]
+    assert parser.saved == [
+        ("image-of-a-t1", output_dir / "a-table-1.png"),
+        ("image-of-a-p1", output_dir / "a-picture-1.png"),
+    ]
+    # Chunks and exported files share the same rendered images
+    assert [c.content for c in chunks[1:]] == [image for image, _path in parser.saved]
+
+
+def test_parse_and_export_can_skip_tables_or_pictures(parser, tmp_path):
+    parser.parse_and_export("a.pdf", tmp_path, save_tables=False)
+    assert parser.saved == [("image-of-a-p1", tmp_path / "a-picture-1.png")]
+
+    parser.saved.clear()
+    parser.parse_and_export("b.pdf", tmp_path, save_pictures=False)
+    assert [path.name for _image, path in parser.saved] == ["b-table-1.png", "b-table-2.png"]
+
+
+def test_encode_jobs_round_trip_pngs_keeping_mode_and_pixels(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    palette_image = Image.new("P", (5, 4), 3)
+    palette_image.putpalette([value for index in range(256) for value in (index, 255 - index, 7)])
+    images = [
+        Image.linear_gradient("L").resize((16, 8)).convert("RGB"),
+        Image.new("LA", (7, 3), (120, 40)),
+        palette_image,
+        Image.new("I;16", (4, 6), 40000),
+    ]
+    jobs = [(image, tmp_path / f"image-{index}.png") for index, image in enumerate(images)]
+
+    pdf_parser._run_encode_jobs(pdf_parser._encode_png, iter(jobs))
+
+    for image, path in jobs:
+        with Image.open(path) as saved:
+            saved.load()
+            assert saved.mode == image.mode
+            assert saved.size == image.size
+            assert saved.tobytes() == image.tobytes()
+            if image.mode == "P":
+                assert saved.getpalette() == image.getpalette()